@@ -1,73 +1,293 @@
 import re
+import gzip
 import json
+import multiprocessing
+import os
+from array import array
 from datetime import datetime
+from contextlib import ExitStack
+from functools import lru_cache, partial
+from itertools import chain, islice
+from pathlib import Path
 import matplotlib.pyplot as plt
-from collections import Counter, defaultdict
+from collections import Counter, deque, namedtuple
 import requests
 import seaborn as sns
 
+try:
+    import re2  # google-re2: linear-time DFA matcher, same API as re
+except ImportError:
+    re2 = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+LogEntry = namedtuple('LogEntry', [
+    'client_ip', 'timestamp', 'http_method', 'request_path',
+    'http_protocol', 'status_code', 'bytes_sent',
+])
+
+# Lines parsed per batch; bounds the memory held by unaggregated lines
+LOG_CHUNK_SIZE = 65536
+# Chunks handed to the pool but not yet merged, whatever the CPU count
+MAX_PENDING_CHUNKS = 8
+
+MONTHS = {
+    'Jan': '01', 'Feb': '02', 'Mar': '03', 'Apr': '04', 'May': '05', 'Jun': '06',
+    'Jul': '07', 'Aug': '08', 'Sep': '09', 'Oct': '10', 'Nov': '11', 'Dec': '12',
+}
+
+
+@lru_cache(maxsize=1 << 17)
+def _parse_ts(timestamp):
+    """Convert a log timestamp to a 'YYYY-MM-DD' date string."""
+    # Fast path: nginx writes a fixed-width 'dd/Mon/YYYY:...' layout
+    day, month, year = timestamp[:2], timestamp[3:6], timestamp[7:11]
+    if month in MONTHS and day.isdigit() and year.isdigit():
+        return f'{year}-{MONTHS[month]}-{day}'
+
+    try:
+        parsed_date = datetime.strptime(timestamp, '%d/%b/%Y:%H:%M:%S %z')
+        return parsed_date.strftime('%Y-%m-%d')
+    except ValueError:
+        return timestamp
+
+
+@lru_cache(maxsize=None)
+def _compile_log_regex(log_regex):
+    """Compile the log pattern once per process."""
+    return (re2 or re).compile(log_regex)
+
+
+def _new_columns():
+    """Return empty log columns; status codes always fit a typed uint16 array."""
+    # Byte counts stay a plain list: the log format puts no bound on them
+    return LogEntry(
+        client_ip=[], timestamp=[], http_method=[], request_path=[], http_protocol=[],
+        status_code=array('H'), bytes_sent=[],
+    )
+
+
+def _new_totals():
+    """Return empty running totals for the summary statistics."""
+    return {
+        'total_requests': 0,
+        'clients': set(),
+        'total_bytes': 0,
+        'method_counts': Counter(),
+        'status_counts': Counter(),
+        'path_counts': Counter(),
+        'daily_counts': Counter(),
+    }
+
+
+def _parse_chunk(lines, log_regex, encode_entries=False):
+    """Parse a chunk of log lines matching log_regex into the chunk's partial totals.
+
+    May run in a worker process, so it only depends on module-level state.
+    When encode_entries is set, the parsed entries are also returned as
+    NDJSON bytes; otherwise None is returned in their place.
+    """
+    match_line = _compile_log_regex(log_regex).match
+    chunk = _new_columns()
+    # Bind the column appends up front; the loop below runs once per line
+    append_client_ip = chunk.client_ip.append
+    append_timestamp = chunk.timestamp.append
+    append_http_method = chunk.http_method.append
+    append_request_path = chunk.request_path.append
+    append_http_protocol = chunk.http_protocol.append
+    append_status_code = chunk.status_code.append
+    append_bytes_sent = chunk.bytes_sent.append
+    _int = int
+
+    for line in lines:
+        match = match_line(line)
+        if not match:
+            continue
+        client_ip, timestamp, http_method, request_path, http_protocol, status_code, bytes_sent = match.groups()
+
+        # Handle cases where bytes_sent is '-'
+        bytes_sent = 0 if bytes_sent == '-' else _int(bytes_sent)
+
+        append_client_ip(client_ip)
+        append_timestamp(timestamp)
+        append_http_method(http_method)
+        append_request_path(request_path)
+        append_http_protocol(http_protocol)
+        append_status_code(_int(status_code))
+        append_bytes_sent(bytes_sent)
+
+    totals = _new_totals()
+    totals['total_requests'] = len(chunk.client_ip)
+    totals['clients'].update(chunk.client_ip)
+    totals['total_bytes'] = sum(chunk.bytes_sent)
+    totals['method_counts'].update(chunk.http_method)
+    totals['status_counts'].update(chunk.status_code)
+    totals['path_counts'].update(chunk.request_path)
+
+    # Count raw timestamps first so each distinct one is converted once
+    daily_counts = totals['daily_counts']
+    for timestamp, count in Counter(chunk.timestamp).items():
+        daily_counts[_parse_ts(timestamp)] += count
+
+    return (_encode_entries(chunk) if encode_entries else None), totals
+
+
+def _encode_entries(chunk):
+    """Encode a chunk's entries as newline-delimited JSON bytes."""
+    # Timestamps are kept raw while parsing; the cached conversion
+    # only does real work once per distinct timestamp
+    columns = chunk._replace(timestamp=map(_parse_ts, chunk.timestamp))
+    records = (dict(zip(LogEntry._fields, row)) for row in zip(*columns))
+
+    return b''.join(map(_json_line, records))
+
+
+def _json_line(record):
+    """Encode one record as a compact JSON line, with orjson when it can."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(record) + b'\n'
+        except orjson.JSONEncodeError:
+            pass  # orjson only handles 64-bit integers
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode() + b'\n'
+
+
+def _available_cpus():
+    """Return the number of CPUs this process may run on."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
 
 class NASAWebLogAnalyzer:
     def __init__(self):
         self.data_source_url = "https://raw.githubusercontent.com/elastic/examples/master/Common%20Data%20Formats/nginx_logs/nginx_logs"
         self.log_regex = r'(\S+) - - \[([^\]]+)\] "(\S+) (\S+) (\S+)" (\d{3}) (\d+|-)'
-        self.logs = []
+        self.cache_path = Path('.cache/nginx_logs.gz')
+        # ETag / Last-Modified of the cached copy, used to revalidate it
+        self.validators_path = self.cache_path.with_name(self.cache_path.name + '.json')
+        # One pooled connection for every request
+        self._session = requests.Session()
+        self._totals = _new_totals()
 
     def download_logs(self):
-        """Download logs from the specified URL."""
+        """Stream log lines from the specified URL, reusing the local gzip cache when it is current."""
+        # Without a validator the cache cannot be checked, so it is downloaded again
+        headers = {}
+        if self.cache_path.exists() and self.validators_path.exists():
+            validators = json.loads(self.validators_path.read_text())
+            if 'ETag' in validators:
+                headers['If-None-Match'] = validators['ETag']
+            if 'Last-Modified' in validators:
+                headers['If-Modified-Since'] = validators['Last-Modified']
+
         print("Downloading logs...")
-        response = requests.get(self.data_source_url)
-        if response.status_code == 200:
-            return response.text.split('\n')
-        else:
-            raise Exception("Failed to download logs")
-
-    def parse_logs(self):
-        """Parse the downloaded logs and extract relevant information."""
+        with self._session.get(self.data_source_url, headers=headers, stream=True,
+                               timeout=(5, 60)) as response:
+            if response.status_code == 304 and headers:
+                yield from self._read_cached_logs()
+                return
+            if response.status_code != 200:
+                raise Exception("Failed to download logs")
+
+            # iter_lines only decodes when the server declared a charset
+            response.encoding = response.encoding or 'utf-8'
+
+            # Write to a side file so an interrupted download never replaces a good cache
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            partial_path = self.cache_path.with_name(self.cache_path.name + '.part')
+            with gzip.open(partial_path, 'wt', encoding='utf-8') as cache_file:
+                for line in response.iter_lines(chunk_size=1 << 20, decode_unicode=True):
+                    cache_file.write(line + '\n')
+                    yield line
+            partial_path.replace(self.cache_path)
+
+            validators = {name: response.headers[name] for name in ('ETag', 'Last-Modified')
+                          if name in response.headers}
+            self.validators_path.write_text(json.dumps(validators))
+
+    def _read_cached_logs(self):
+        """Yield log lines from the local gzip cache."""
+        print(f"Reading cached logs from {self.cache_path}...")
+        with gzip.open(self.cache_path, 'rt', encoding='utf-8') as cache_file:
+            for line in cache_file:
+                yield line.rstrip('\n')
+
+    def parse_logs(self, output_file=None):
+        """Parse the downloaded logs chunk by chunk and extract relevant information.
+
+        When output_file is given, every parsed entry is also written to it as
+        newline-delimited JSON, one chunk at a time, so no entry is kept in memory.
+        """
         print("Parsing logs...")
         log_lines = self.download_logs()
-
-        for line in log_lines:
-            if not line.strip():
-                continue
-
-            match = re.match(self.log_regex, line)
-            if match:
-                client_ip, timestamp, http_method, request_path, http_protocol, status_code, bytes_sent = match.groups()
-
-                # Convert timestamp
-                try:
-                    parsed_date = datetime.strptime(timestamp, '%d/%b/%Y:%H:%M:%S %z')
-                    formatted_date = parsed_date.strftime('%Y-%m-%d')
-                except ValueError:
-                    formatted_date = timestamp
-
-                # Handle cases where bytes_sent is '-'
-                bytes_sent = int(bytes_sent) if bytes_sent != '-' else 0
-
-                log_entry = {
-                    'client_ip': client_ip,
-                    'timestamp': formatted_date,
-                    'http_method': http_method,
-                    'request_path': request_path,
-                    'http_protocol': http_protocol,
-                    'status_code': int(status_code),
-                    'bytes_sent': bytes_sent
-                }
-                self.logs.append(log_entry)
-
-        print(f"Processed {len(self.logs)} log entries")
-
-    def save_logs_to_json(self, output_file):
-        """Save parsed log data to a JSON file."""
-        with open(output_file, 'w') as file:
-            json.dump(self.logs, file, indent=2)
-        print(f"Data saved to {output_file}")
+        chunks = iter(lambda: list(islice(log_lines, LOG_CHUNK_SIZE)), [])
+        parse_chunk = partial(_parse_chunk, log_regex=self.log_regex,
+                              encode_entries=output_file is not None)
+        workers = min(_available_cpus(), MAX_PENDING_CHUNKS)
+
+        with ExitStack() as stack:
+            entries_file = stack.enter_context(open(output_file, 'wb')) if output_file else None
+
+            # A pool only pays for itself with several CPUs and more than one chunk
+            head = list(islice(chunks, 2 if workers > 1 else 1))
+            if len(head) < 2:
+                for chunk in chain(head, chunks):
+                    self._ingest(*parse_chunk(chunk), entries_file)
+            else:
+                pool = stack.enter_context(multiprocessing.Pool(workers))
+
+                # Keep up to two chunks per worker in flight, never more than
+                # MAX_PENDING_CHUNKS: the download keeps going while they parse, and
+                # unparsed lines stay bounded on any machine. Results are taken
+                # oldest first so entries are written in line order.
+                max_pending = min(2 * workers, MAX_PENDING_CHUNKS)
+                pending = deque()
+                for chunk in chain(head, chunks):
+                    pending.append(pool.apply_async(parse_chunk, (chunk,)))
+                    if len(pending) >= max_pending:
+                        self._ingest(*pending.popleft().get(), entries_file)
+                while pending:
+                    self._ingest(*pending.popleft().get(), entries_file)
+
+        print(f"Processed {self._totals['total_requests']} log entries")
+        if output_file:
+            print(f"Data saved to {output_file}")
+
+    def _ingest(self, entries, chunk_totals, entries_file=None):
+        """Fold one parsed chunk's partial totals into the analyzer and write out its entries."""
+        totals = self._totals
+        totals['total_requests'] += chunk_totals['total_requests']
+        totals['clients'] |= chunk_totals['clients']
+        totals['total_bytes'] += chunk_totals['total_bytes']
+        totals['method_counts'] += chunk_totals['method_counts']
+        totals['status_counts'] += chunk_totals['status_counts']
+        totals['path_counts'] += chunk_totals['path_counts']
+        totals['daily_counts'] += chunk_totals['daily_counts']
+
+        if entries_file is not None:
+            entries_file.write(entries)
+
+    def compute_statistics(self):
+        """Summarize the running totals gathered while parsing."""
+        totals = self._totals
+        return {
+            'total_requests': totals['total_requests'],
+            'unique_clients': len(totals['clients']),
+            'total_bytes': totals['total_bytes'],
+            'method_counts': totals['method_counts'],
+            'status_counts': totals['status_counts'],
+            'path_counts': totals['path_counts'],
+            'daily_counts': dict(sorted(totals['daily_counts'].items())),
+        }
 
     def plot_http_method_distribution(self):
         """Generate an enhanced pie chart of HTTP methods distribution."""
-        http_methods = [entry['http_method'] for entry in self.logs]
-        method_counts = Counter(http_methods)
+        method_counts = self.compute_statistics()['method_counts']
 
         plt.figure(figsize=(10, 6))
         colors = sns.color_palette('husl', n_colors=len(method_counts))
@@ -79,8 +299,7 @@ class NASAWebLogAnalyzer:
 
     def plot_status_code_distribution(self):
         """Generate an enhanced bar chart of status codes distribution."""
-        status_codes = [entry['status_code'] for entry in self.logs]
-        status_counts = Counter(status_codes)
+        status_counts = self.compute_statistics()['status_counts']
 
         plt.figure(figsize=(12, 6))
         sns.barplot(x=list(status_counts.keys()), y=list(status_counts.values()))
@@ -97,12 +316,9 @@ class NASAWebLogAnalyzer:
 
     def plot_daily_request_trend(self):
         """Generate an enhanced line chart of daily requests."""
-        daily_request_counts = defaultdict(int)
-        for entry in self.logs:
-            daily_request_counts[entry['timestamp']] += 1
-
-        sorted_dates = sorted(daily_request_counts.keys())
-        sorted_counts = [daily_request_counts[date] for date in sorted_dates]
+        daily_request_counts = self.compute_statistics()['daily_counts']
+        sorted_dates = list(daily_request_counts.keys())
+        sorted_counts = list(daily_request_counts.values())
 
         plt.figure(figsize=(15, 6))
         sns.lineplot(x=sorted_dates, y=sorted_counts, marker='o')
@@ -117,10 +333,9 @@ class NASAWebLogAnalyzer:
 
     def plot_top_requested_paths(self, top_n=10):
         """Generate a horizontal bar chart of the most requested paths."""
-        request_paths = [entry['request_path'] for entry in self.logs]
-        top_paths = Counter(request_paths).most_common(top_n)
+        top_paths = self.compute_statistics()['path_counts'].most_common(top_n)
 
-                plt.figure(figsize=(12, 8))
+        plt.figure(figsize=(12, 8))
         paths, counts = zip(*top_paths)
 
         sns.barplot(x=counts, y=paths)
@@ -135,14 +350,15 @@ class NASAWebLogAnalyzer:
 
     def generate_report(self):
         """Generate a detailed report with statistics."""
-        total_requests = len(self.logs)
-        method_counts = Counter(entry['http_method'] for entry in self.logs)
-        status_counts = Counter(entry['status_code'] for entry in self.logs)
-        unique_clients = len(set(entry['client_ip'] for entry in self.logs))
-        total_bytes = sum(entry['bytes_sent'] for entry in self.logs)
+        stats = self.compute_statistics()
+        total_requests = stats['total_requests']
+        method_counts = stats['method_counts']
+        status_counts = stats['status_counts']
+        unique_clients = stats['unique_clients']
+        total_bytes = stats['total_bytes']
 
         # Calculate the most common paths
-        top_paths = Counter(entry['request_path'] for entry in self.logs).most_common(10)
+        top_paths = stats['path_counts'].most_common(10)
 
         report_data = {
             'total_requests': total_requests,
@@ -154,8 +370,17 @@ class NASAWebLogAnalyzer:
             'top_10_paths': dict(top_paths)
         }
 
-        with open('nasa_analysis_report.json', 'w') as file:
-            json.dump(report_data, file, indent=2)
+        report_json = None
+        if orjson is not None:
+            try:
+                report_json = orjson.dumps(report_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            except orjson.JSONEncodeError:
+                pass  # orjson only handles 64-bit integers
+        if report_json is None:
+            report_json = json.dumps(report_data, indent=2, ensure_ascii=False).encode('utf-8')
+
+        with open('nasa_analysis_report.json', 'wb') as file:
+            file.write(report_json)
 
         print("Report generated in nasa_analysis_report.json")
 
@@ -165,9 +390,8 @@ def main():
         # Create an instance of the log analyzer
         log_analyzer = NASAWebLogAnalyzer()
 
-        # Parse logs
-        log_analyzer.parse_logs()
-        log_analyzer.save_logs_to_json('nasa_logs_processed.json')
+        # Parse logs, streaming the parsed entries to disk
+        log_analyzer.parse_logs('nasa_logs_processed.ndjson')
 
         # Generate visualizations
         print("Generating visualizations...")